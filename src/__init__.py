@@ -34,8 +34,15 @@ def main():
 
     args = parser.parse_args()
 
+    # Prefer uvloop's libuv-based event loop for the network-bound server
     try:
-        asyncio.run(serve(
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+
+    try:
+        run(serve(
             elevenlabs_api_key=args.elevenlabs_api_key,
             mia_host=args.mia_host,
             mia_port=args.mia_port
@@ -3,14 +3,23 @@ ElevenLabs API client for voice synthesis and cloning.
 """
 
 import asyncio
+import hashlib
 import json
 import logging
+import math
+import mmap
 import os
-from typing import Dict, List, Optional, Any
+import tempfile
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from pathlib import Path
 
 import httpx
 
+from .http_client import get_http_client
+from .json_codec import json_dumps, json_loads
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,13 +27,32 @@ class ElevenLabsClient:
     """Client for ElevenLabs Text-to-Speech API."""
 
     BASE_URL = "https://api.elevenlabs.io"
+    STREAM_CHUNK_SIZE = 65536
+    # Seconds to keep read-mostly API responses before fetching them again
+    VOICES_CACHE_TTL = 300.0
+    USER_CACHE_TTL = 60.0
+    # Speech requests arriving within this window are dispatched together,
+    # with at most TTS_BATCH_SIZE in flight at once
+    TTS_BATCH_WINDOW = 0.01
+    TTS_BATCH_SIZE = 8
+    # Upper bound on concurrent voice detail requests, to stay within rate limits
+    VOICE_DETAIL_CONCURRENCY = 10
+    # Upper bound on in-flight jobs in synth_many(), matching the batch size
+    SYNTH_CONCURRENCY = 8
+    # Speech requests rejected with these statuses are retried with backoff,
+    # spending at most RETRY_MAX_WAIT seconds so MCP calls don't time out
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    RETRY_MAX_ATTEMPTS = 3
+    RETRY_BASE_DELAY = 0.5
+    RETRY_MIN_DELAY = 0.1
+    RETRY_MAX_WAIT = 5.0
 
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("ELEVENLABS_API_KEY")
         if not self.api_key:
             raise ValueError("ElevenLabs API key not provided")
 
-        self.client = httpx.AsyncClient(
+        self.client = get_http_client(
             base_url=self.BASE_URL,
             headers={
                 "Accept": "application/json",
@@ -33,19 +61,146 @@ class ElevenLabsClient:
             },
             timeout=30.0
         )
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_locks: Dict[str, asyncio.Lock] = {}
+        self._tts_queue: asyncio.Queue = asyncio.Queue()
+        self._tts_batcher: Optional[asyncio.Task] = None
+        self._tts_slots = asyncio.Semaphore(self.TTS_BATCH_SIZE)
+        self._tts_in_flight: Set[asyncio.Task] = set()
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        # The connection pool is shared process-wide; see close_http_client().
+        await self.aclose()
+
+    async def aclose(self):
+        """Stop dispatching speech requests and cancel any queued or in flight."""
+        if self._tts_batcher is not None and not self._tts_batcher.done():
+            self._tts_batcher.cancel()
+            try:
+                await self._tts_batcher
+            except asyncio.CancelledError:
+                pass
+        self._tts_batcher = None
+
+        while not self._tts_queue.empty():
+            _, future = self._tts_queue.get_nowait()
+            future.cancel()
+
+        in_flight = list(self._tts_in_flight)
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _submit_speech(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Queue a speech request for the batcher and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._tts_queue.put_nowait((request, future))
+        if self._tts_batcher is None or self._tts_batcher.done():
+            self._tts_batcher = loop.create_task(self._run_speech_batches())
+        return await future
+
+    async def _run_speech_batches(self):
+        """Dispatch queued speech requests until the queue drains.
+
+        Requests that arrive within TTS_BATCH_WINDOW of each other share one
+        wakeup and run concurrently over the pooled connections. Each request
+        starts as soon as one of the TTS_BATCH_SIZE slots is free, so a slow
+        request never holds up the ones queued behind it.
+        """
+        while not self._tts_queue.empty():
+            await asyncio.sleep(self.TTS_BATCH_WINDOW)
+            while not self._tts_queue.empty():
+                await self._tts_slots.acquire()
+                request, future = self._tts_queue.get_nowait()
+                task = asyncio.ensure_future(self._dispatch_speech(request, future))
+                self._tts_in_flight.add(task)
+                task.add_done_callback(self._speech_finished)
+
+    def _speech_finished(self, task: asyncio.Task):
+        """Free the slot held by a finished speech request."""
+        self._tts_in_flight.discard(task)
+        self._tts_slots.release()
+
+    @staticmethod
+    async def _dispatch_speech(
+        request: Callable[[], Awaitable[Any]],
+        future: asyncio.Future
+    ):
+        """Run one queued speech request and resolve its future."""
+        if future.done():
+            # The caller stopped waiting while the request was queued
+            return
+
+        task = asyncio.ensure_future(request())
+        # Abort the upstream request if the caller stops waiting for it
+        future.add_done_callback(lambda _: task.cancel())
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    async def _cached(
+        self,
+        key: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return a cached value for key, calling fetch when it is missing or stale.
+
+        Concurrent callers for the same key share a single in-flight fetch.
+        Errors raised by fetch are not cached.
+        """
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+
+        lock = self._cache_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another caller may have refreshed the entry while we waited
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                return entry[1]
+
+            value = await fetch()
+            self._cache[key] = (time.monotonic(), value)
+            return value
+
+    async def _get_json(self, path: str) -> Any:
+        """GET an API path and decode the JSON response."""
+        response = await self.client.get(path)
+        response.raise_for_status()
+        return json_loads(response.content)
+
+    async def _get_cached_json(self, path: str, ttl: float) -> Any:
+        """GET an API path, serving it from the response cache while fresh."""
+        return await self._cached(path, ttl, lambda: self._get_json(path))
+
+    def clear_cache(self):
+        """Drop all cached API responses."""
+        self._cache.clear()
+
+    async def refresh_voices(self) -> List[Dict[str, Any]]:
+        """Invalidate cached voice data and fetch the voice list again."""
+        for key in list(self._cache):
+            if key.startswith("/v1/voices"):
+                del self._cache[key]
+        return await self.get_voices()
 
     async def get_voices(self) -> List[Dict[str, Any]]:
         """Get list of available voices."""
         try:
-            response = await self.client.get("/v1/voices")
-            response.raise_for_status()
-            data = response.json()
+            data = await self._get_cached_json("/v1/voices", self.VOICES_CACHE_TTL)
             return data.get("voices", [])
         except httpx.HTTPError as e:
             logger.error(f"Failed to get voices: {e}")
@@ -54,49 +209,254 @@ class ElevenLabsClient:
     async def get_voice(self, voice_id: str) -> Optional[Dict[str, Any]]:
         """Get details of a specific voice."""
         try:
-            response = await self.client.get(f"/v1/voices/{voice_id}")
-            response.raise_for_status()
-            return response.json()
+            return await self._get_cached_json(f"/v1/voices/{voice_id}", self.VOICES_CACHE_TTL)
         except httpx.HTTPError as e:
             logger.error(f"Failed to get voice {voice_id}: {e}")
             return None
 
+    async def get_voices_detailed(self, voice_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Get details of several voices concurrently.
+
+        At most VOICE_DETAIL_CONCURRENCY requests are in flight at once. Results
+        are returned in the order of voice_ids, with None for any voice that
+        could not be fetched.
+        """
+        semaphore = asyncio.Semaphore(self.VOICE_DETAIL_CONCURRENCY)
+
+        async def fetch(voice_id: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.get_voice(voice_id)
+
+        results = await asyncio.gather(
+            *(fetch(voice_id) for voice_id in voice_ids),
+            return_exceptions=True
+        )
+        details = []
+        for voice_id, result in zip(voice_ids, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to get voice {voice_id}: {result}")
+                result = None
+            details.append(result)
+        return details
+
+    @staticmethod
+    def _speech_payload(
+        text: str,
+        model_id: str,
+        voice_settings: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build the request body for a text-to-speech call."""
+        return {
+            "text": text,
+            "model_id": model_id,
+            "voice_settings": voice_settings or {
+                "stability": 0.5,
+                "similarity_boost": 0.5
+            }
+        }
+
+    # Serialized prefix of a payload template, up to and including its empty text
+    _TEMPLATE_TEXT_PREFIX = b'{"text":""'
+
+    @classmethod
+    def speech_payload_template(
+        cls,
+        model_id: str,
+        voice_settings: Optional[Dict[str, Any]]
+    ) -> bytes:
+        """Pre-serialize a text-to-speech request body with an empty text.
+
+        Use render_speech_payload() to fill in the text for each request.
+        """
+        return json_dumps(cls._speech_payload("", model_id, voice_settings))
+
+    @classmethod
+    def render_speech_payload(cls, template: bytes, text: str) -> bytes:
+        """Splice text into a template from speech_payload_template()."""
+        return b'{"text":' + json_dumps(text) + template[len(cls._TEMPLATE_TEXT_PREFIX):]
+
+    def _retry_delay(
+        self,
+        response: httpx.Response,
+        attempt: int,
+        waited: float
+    ) -> Optional[float]:
+        """Return how long to wait before retrying a speech request, or None.
+
+        Honours a numeric Retry-After header (never waiting less than
+        RETRY_MIN_DELAY), otherwise backs off exponentially. Gives up after
+        RETRY_MAX_ATTEMPTS retries or once the next wait would exceed
+        RETRY_MAX_WAIT in total.
+        """
+        if response.status_code not in self.RETRY_STATUSES:
+            return None
+        if attempt >= self.RETRY_MAX_ATTEMPTS:
+            return None
+
+        delay = self.RETRY_BASE_DELAY * 2 ** min(attempt, self.RETRY_MAX_ATTEMPTS)
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                pass
+        if not math.isfinite(delay):
+            return None
+        delay = max(delay, self.RETRY_MIN_DELAY)
+
+        if waited + delay > self.RETRY_MAX_WAIT:
+            return None
+        logger.warning(
+            f"Speech request failed with HTTP {response.status_code}, retrying in {delay:.1f}s"
+        )
+        return delay
+
+    def _speech_request_body(
+        self,
+        text: str,
+        model_id: str,
+        voice_settings: Optional[Dict[str, Any]],
+        payload_bytes: Optional[bytes]
+    ) -> bytes:
+        """Return the serialized body of a text-to-speech request."""
+        if payload_bytes is not None:
+            return payload_bytes
+        return json_dumps(self._speech_payload(text, model_id, voice_settings))
+
     async def generate_speech(
         self,
         text: str,
         voice_id: str,
         model_id: str = "eleven_monolingual_v1",
-        voice_settings: Optional[Dict[str, Any]] = None
+        voice_settings: Optional[Dict[str, Any]] = None,
+        payload_bytes: Optional[bytes] = None
     ) -> Optional[bytes]:
-        """Generate speech from text."""
+        """Generate speech from text.
+
+        payload_bytes may carry a pre-serialized request body (see
+        render_speech_payload()), in which case it is sent as-is instead of
+        being built from the other arguments.
+        """
+        return await self._submit_speech(
+            lambda: self._generate_one(text, voice_id, model_id, voice_settings, payload_bytes)
+        )
+
+    async def _generate_one(
+        self,
+        text: str,
+        voice_id: str,
+        model_id: str,
+        voice_settings: Optional[Dict[str, Any]],
+        payload_bytes: Optional[bytes]
+    ) -> Optional[bytes]:
+        """Send a single text-to-speech request and return the audio."""
         try:
-            payload = {
-                "text": text,
-                "model_id": model_id,
-                "voice_settings": voice_settings or {
-                    "stability": 0.5,
-                    "similarity_boost": 0.5
-                }
-            }
+            body = self._speech_request_body(text, model_id, voice_settings, payload_bytes)
+
+            attempt, waited = 0, 0.0
+            while True:
+                response = await self.client.post(
+                    f"/v1/text-to-speech/{voice_id}",
+                    content=body,
+                    headers={"Accept": "audio/mpeg"}
+                )
+                delay = self._retry_delay(response, attempt, waited)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+                attempt, waited = attempt + 1, waited + delay
 
-            response = await self.client.post(
-                f"/v1/text-to-speech/{voice_id}",
-                json=payload,
-                headers={"Accept": "audio/mpeg"}
-            )
             response.raise_for_status()
+            logger.debug(f"Speech generated over {response.http_version}")
             return response.content
 
         except httpx.HTTPError as e:
             logger.error(f"Failed to generate speech: {e}")
             return None
 
+    async def synth_many(self, jobs: List[Dict[str, Any]]) -> List[Optional[bytes]]:
+        """Generate speech for many jobs with bounded concurrency.
+
+        Each job is a dict of generate_speech() keyword arguments. A new job is
+        only started once fewer than SYNTH_CONCURRENCY are in flight, so large
+        job lists don't create all their tasks up front. Results are returned
+        in job order; if one job raises, the remaining jobs are cancelled and
+        awaited before the error is re-raised.
+        """
+        semaphore = asyncio.Semaphore(self.SYNTH_CONCURRENCY)
+        tasks = []
+        try:
+            for job in jobs:
+                await semaphore.acquire()
+                task = asyncio.create_task(self.generate_speech(**job))
+                task.add_done_callback(lambda _: semaphore.release())
+                tasks.append(task)
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def stream_speech(
+        self,
+        text: str,
+        voice_id: str,
+        sink: Callable[[bytes], Awaitable[Any]],
+        model_id: str = "eleven_monolingual_v1",
+        voice_settings: Optional[Dict[str, Any]] = None,
+        payload_bytes: Optional[bytes] = None
+    ) -> bool:
+        """Generate speech from text, passing audio chunks to sink as they arrive.
+
+        Returns True once the whole response has been streamed to the sink.
+        payload_bytes is handled as in generate_speech().
+        """
+        return await self._submit_speech(
+            lambda: self._stream_one(text, voice_id, sink, model_id, voice_settings, payload_bytes)
+        )
+
+    async def _stream_one(
+        self,
+        text: str,
+        voice_id: str,
+        sink: Callable[[bytes], Awaitable[Any]],
+        model_id: str,
+        voice_settings: Optional[Dict[str, Any]],
+        payload_bytes: Optional[bytes]
+    ) -> bool:
+        """Send a single text-to-speech request, streaming the audio to sink."""
+        try:
+            body = self._speech_request_body(text, model_id, voice_settings, payload_bytes)
+
+            attempt, waited = 0, 0.0
+            while True:
+                async with self.client.stream(
+                    "POST",
+                    f"/v1/text-to-speech/{voice_id}",
+                    content=body,
+                    headers={"Accept": "audio/mpeg"}
+                ) as response:
+                    delay = self._retry_delay(response, attempt, waited)
+                    if delay is None:
+                        response.raise_for_status()
+                        logger.debug(f"Speech streamed over {response.http_version}")
+                        async for chunk in response.aiter_bytes(self.STREAM_CHUNK_SIZE):
+                            await sink(chunk)
+                        return True
+
+                # Release the rejected response's connection before waiting
+                await asyncio.sleep(delay)
+                attempt, waited = attempt + 1, waited + delay
+
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to stream speech: {e}")
+            return False
+
     async def get_models(self) -> List[Dict[str, Any]]:
         """Get list of available models."""
         try:
-            response = await self.client.get("/v1/models")
-            response.raise_for_status()
-            return response.json()
+            return await self._get_cached_json("/v1/models", self.VOICES_CACHE_TTL)
         except httpx.HTTPError as e:
             logger.error(f"Failed to get models: {e}")
             return []
@@ -104,9 +464,7 @@ class ElevenLabsClient:
     async def get_user_info(self) -> Optional[Dict[str, Any]]:
         """Get user account information."""
         try:
-            response = await self.client.get("/v1/user")
-            response.raise_for_status()
-            return response.json()
+            return await self._get_cached_json("/v1/user", self.USER_CACHE_TTL)
         except httpx.HTTPError as e:
             logger.error(f"Failed to get user info: {e}")
             return None
@@ -115,18 +473,29 @@ class ElevenLabsClient:
 class VoiceProfileManager:
     """Manages voice profiles and preferences."""
 
+    # Profiles files larger than this are parsed from a memory map
+    MMAP_THRESHOLD = 10 * 1024 * 1024
+
     def __init__(self, config_dir: Path = Path.home() / ".elevenlabs-mia"):
         self.config_dir = config_dir
         self.config_dir.mkdir(exist_ok=True)
         self.profiles_file = self.config_dir / "voice_profiles.json"
+        self._save_lock = asyncio.Lock()
+        self._payload_templates: Dict[Tuple[str, str], bytes] = {}
         self._load_profiles()
 
     def _load_profiles(self):
         """Load voice profiles from disk."""
         if self.profiles_file.exists():
             try:
-                with open(self.profiles_file, 'r') as f:
-                    self.profiles = json.load(f)
+                if self.profiles_file.stat().st_size > self.MMAP_THRESHOLD:
+                    with open(self.profiles_file, 'rb') as f, \
+                            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                            memoryview(mapped) as data:
+                        self.profiles = json_loads(data)
+                else:
+                    data = self.profiles_file.read_bytes()
+                    self.profiles = json_loads(data) if data else {}
             except Exception as e:
                 logger.error(f"Failed to load voice profiles: {e}")
                 self.profiles = {}
@@ -136,24 +505,69 @@ class VoiceProfileManager:
     def _save_profiles(self):
         """Save voice profiles to disk."""
         try:
-            with open(self.profiles_file, 'w') as f:
-                json.dump(self.profiles, f, indent=2)
+            self.profiles_file.write_bytes(json_dumps(self.profiles))
         except Exception as e:
             logger.error(f"Failed to save voice profiles: {e}")
 
-    def create_profile(self, name: str, voice_id: str, settings: Dict[str, Any]):
-        """Create a voice profile."""
+    async def _asave_profiles(self):
+        """Save voice profiles in a worker thread, keeping writes in order."""
+        async with self._save_lock:
+            try:
+                # Serialize on the loop so the worker thread never sees a dict mid-update
+                data = json_dumps(self.profiles)
+                await asyncio.to_thread(self.profiles_file.write_bytes, data)
+            except Exception as e:
+                logger.error(f"Failed to save voice profiles: {e}")
+
+    def _put_profile(self, name: str, voice_id: str, settings: Dict[str, Any]):
+        """Store a voice profile in memory."""
         self.profiles[name] = {
             "voice_id": voice_id,
             "settings": settings,
-            "created_at": asyncio.get_event_loop().time()
+            "created_at": time.time()
         }
+        self._forget_payload_templates(name)
+
+    def create_profile(self, name: str, voice_id: str, settings: Dict[str, Any]):
+        """Create a voice profile."""
+        self._put_profile(name, voice_id, settings)
         self._save_profiles()
 
+    async def acreate_profile(self, name: str, voice_id: str, settings: Dict[str, Any]):
+        """Create a voice profile and save it without blocking the event loop."""
+        self._put_profile(name, voice_id, settings)
+        await self._asave_profiles()
+
     def get_profile(self, name: str) -> Optional[Dict[str, Any]]:
         """Get a voice profile."""
         return self.profiles.get(name)
 
+    def _forget_payload_templates(self, name: str):
+        """Drop cached payload templates for a changed profile."""
+        for key in [key for key in self._payload_templates if key[0] == name]:
+            del self._payload_templates[key]
+
+    def speech_payload(
+        self,
+        name: str,
+        text: str,
+        model_id: str = "eleven_monolingual_v1"
+    ) -> Optional[bytes]:
+        """Build a serialized text-to-speech request body for a voice profile.
+
+        The profile's settings are serialized once and kept in memory, so each
+        request only has to encode its text.
+        """
+        profile = self.profiles.get(name)
+        if profile is None:
+            return None
+
+        template = self._payload_templates.get((name, model_id))
+        if template is None:
+            template = ElevenLabsClient.speech_payload_template(model_id, profile["settings"])
+            self._payload_templates[(name, model_id)] = template
+        return ElevenLabsClient.render_speech_payload(template, text)
+
     def list_profiles(self) -> List[str]:
         """List all voice profile names."""
         return list(self.profiles.keys())
@@ -162,4 +576,123 @@ class VoiceProfileManager:
         """Delete a voice profile."""
         if name in self.profiles:
             del self.profiles[name]
-            self._save_profiles()
\ No newline at end of file
+            self._forget_payload_templates(name)
+            self._save_profiles()
+
+    async def adelete_profile(self, name: str):
+        """Delete a voice profile and save without blocking the event loop."""
+        if name in self.profiles:
+            del self.profiles[name]
+            self._forget_payload_templates(name)
+            await self._asave_profiles()
+
+
+class SpeechCache:
+    """Content-addressed disk cache of generated speech.
+
+    Entries are keyed by everything that affects the audio, so repeated
+    phrases (such as status readouts) are served from disk without calling
+    ElevenLabs again.
+    """
+
+    # Entries older than this are regenerated
+    MAX_AGE = 7 * 24 * 60 * 60.0
+    # Least recently used entries are evicted beyond this many bytes
+    MAX_SIZE = 100 * 1024 * 1024
+    # Partial entries older than this were abandoned by a crashed writer
+    PART_MAX_AGE = 60 * 60.0
+
+    def __init__(
+        self,
+        config_dir: Path = Path.home() / ".elevenlabs-mia",
+        max_age: float = MAX_AGE,
+        max_size: int = MAX_SIZE
+    ):
+        self.cache_dir = config_dir / "tts_cache"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.max_size = max_size
+        # Bytes on disk as of the last scan plus entries committed since, so
+        # that commits only rescan the directory once the cap may be exceeded
+        self._size: Optional[int] = None
+        self._size_lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        text: str,
+        voice_id: str,
+        model_id: str,
+        voice_settings: Optional[Dict[str, Any]]
+    ) -> str:
+        """Return the cache key for a speech request."""
+        request = json.dumps([text, voice_id, model_id, voice_settings], sort_keys=True)
+        return hashlib.blake2b(request.encode(), digest_size=16).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """Return the file path of a cache entry."""
+        return self.cache_dir / f"{key}.mp3"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the path of a fresh cache entry, or None on a miss."""
+        path = self.path_for(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        now = time.time()
+        if now - stat.st_mtime > self.max_age:
+            path.unlink(missing_ok=True)
+            return None
+
+        # Track recency in atime so that hits don't extend an entry's lifetime
+        os.utime(path, (now, stat.st_mtime))
+        return path
+
+    def new_entry(self):
+        """Open a temporary file in the cache directory to write audio into."""
+        return tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".part", delete=False
+        )
+
+    def commit(self, temp_path: str, key: str) -> Path:
+        """Atomically publish a completed entry and evict old ones."""
+        path = self.path_for(key)
+        size = os.stat(temp_path).st_size
+        os.replace(temp_path, path)
+        with self._size_lock:
+            if self._size is None or self._size + size > self.max_size:
+                self._evict(keep=path)
+            else:
+                self._size += size
+        return path
+
+    def _evict(self, keep: Path):
+        """Remove least recently used entries until the cache fits max_size.
+
+        Partial entries count towards the size, and those older than
+        PART_MAX_AGE are removed. keep, the entry just published, is never
+        evicted.
+        """
+        now = time.time()
+        entries = []
+        total = 0
+        for path in self.cache_dir.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == ".part" and now - stat.st_mtime > self.PART_MAX_AGE:
+                path.unlink(missing_ok=True)
+                continue
+            total += stat.st_size
+            if path.suffix == ".mp3" and path != keep:
+                entries.append((stat.st_atime, stat.st_size, path))
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
@@ -0,0 +1,65 @@
+"""
+Process-wide HTTP connection pool shared by the ElevenLabs and MIA clients.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Keep warm connections around between bursts of speech generation so repeated
+# calls reuse the TLS session instead of paying a fresh handshake each time.
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=300
+)
+# Connection failures are retried by the transport before surfacing
+HTTP_RETRIES = 3
+
+_transport: Optional[httpx.AsyncHTTPTransport] = None
+
+
+def _get_transport() -> httpx.AsyncHTTPTransport:
+    """Return the shared pooled transport, creating it on first use."""
+    global _transport
+    if _transport is None:
+        _transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=HTTP_LIMITS,
+            retries=HTTP_RETRIES
+        )
+    return _transport
+
+
+def get_http_client(
+    base_url: str = "",
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30.0
+) -> httpx.AsyncClient:
+    """Get an HTTP client backed by the shared connection pool.
+
+    Each caller keeps its own base URL and default headers (so the ElevenLabs
+    API key is never sent to MIA), while all of them reuse the same pooled
+    connections. Clients must not be closed individually; call
+    close_http_client() once on shutdown instead.
+    """
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        timeout=timeout,
+        transport=_get_transport()
+    )
+
+
+async def close_http_client() -> None:
+    """Close the shared connection pool."""
+    global _transport
+    if _transport is not None:
+        transport, _transport = _transport, None
+        try:
+            await transport.aclose()
+        except Exception as e:
+            logger.error(f"Failed to close HTTP connection pool: {e}")
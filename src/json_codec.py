@@ -0,0 +1,27 @@
+"""
+Compact JSON encoding shared by the ElevenLabs and MIA clients.
+
+Uses orjson when it is installed and falls back to the stdlib encoder.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize obj to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def json_loads(data: Union[bytes, memoryview]) -> Any:
+    """Deserialize JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
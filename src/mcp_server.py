@@ -5,10 +5,11 @@ ElevenLabs MCP Server for MIA voice integration.
 import asyncio
 import json
 import logging
-import tempfile
+import time
 import os
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import httpx
 import websockets
@@ -22,7 +23,9 @@ from mcp.types import (
 )
 from pydantic import BaseModel, Field
 
-from .elevenlabs_client import ElevenLabsClient, VoiceProfileManager
+from .elevenlabs_client import ElevenLabsClient, SpeechCache, VoiceProfileManager
+from .http_client import close_http_client, get_http_client
+from .json_codec import json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
@@ -90,6 +93,54 @@ class ElevenLabsTools(str):
     GET_MIA_STATUS = "mia_get_status_voice"
 
 
+# Tool definitions are static, so their JSON schemas are generated once at import
+_TOOLS: List[Tool] = [
+    Tool(
+        name=ElevenLabsTools.LIST_VOICES,
+        description="List all available ElevenLabs voices",
+        inputSchema=ListVoices.model_json_schema(),
+    ),
+    Tool(
+        name=ElevenLabsTools.GET_VOICE_DETAILS,
+        description="Get detailed information about a specific voice",
+        inputSchema=GetVoiceDetails.model_json_schema(),
+    ),
+    Tool(
+        name=ElevenLabsTools.GENERATE_SPEECH,
+        description="Convert text to speech using ElevenLabs",
+        inputSchema=GenerateSpeech.model_json_schema(),
+    ),
+    Tool(
+        name=ElevenLabsTools.CREATE_VOICE_PROFILE,
+        description="Create a reusable voice profile with specific settings",
+        inputSchema=CreateVoiceProfile.model_json_schema(),
+    ),
+    Tool(
+        name=ElevenLabsTools.LIST_VOICE_PROFILES,
+        description="List all saved voice profiles",
+        inputSchema=ListVoiceProfiles.model_json_schema(),
+    ),
+    Tool(
+        name=ElevenLabsTools.GENERATE_SPEECH_FROM_PROFILE,
+        description="Generate speech using a saved voice profile",
+        inputSchema=GenerateSpeechFromProfile.model_json_schema(),
+    ),
+    Tool(
+        name=ElevenLabsTools.MIA_VOICE_COMMAND,
+        description="Execute a voice command to control MIA IoT devices",
+        inputSchema=MIAVoiceCommand.model_json_schema(),
+    ),
+    Tool(
+        name=ElevenLabsTools.GET_MIA_STATUS,
+        description="Get MIA system status with voice feedback",
+        inputSchema=GetMIAStatus.model_json_schema(),
+    ),
+]
+
+# Extracts the fields shown for each entry in a voice listing
+_voice_name_and_id = itemgetter("name", "voice_id")
+
+
 class MIAVoiceIntegration:
     """Integration between ElevenLabs and MIA system."""
 
@@ -97,13 +148,14 @@ class MIAVoiceIntegration:
         self.mia_host = mia_host
         self.mia_port = mia_port
         self.mia_base_url = f"http://{mia_host}:{mia_port}"
-        self.client = httpx.AsyncClient(timeout=10.0)
+        self.client = get_http_client(base_url=self.mia_base_url, timeout=10.0)
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        # The connection pool is shared process-wide; see close_http_client().
+        pass
 
     async def execute_voice_command(self, command_text: str) -> Dict[str, Any]:
         """Execute a voice command through MIA."""
@@ -113,12 +165,16 @@ class MIAVoiceIntegration:
             payload = {
                 "command": command_text,
                 "source": "voice",
-                "timestamp": asyncio.get_event_loop().time()
+                "timestamp": time.time()
             }
 
-            response = await self.client.post(f"{self.mia_base_url}/voice-command", json=payload)
+            response = await self.client.post(
+                "/voice-command",
+                content=json_dumps(payload),
+                headers={"Content-Type": "application/json"}
+            )
             response.raise_for_status()
-            return response.json()
+            return json_loads(response.content)
 
         except httpx.HTTPError as e:
             logger.error(f"Failed to execute voice command: {e}")
@@ -127,9 +183,9 @@ class MIAVoiceIntegration:
     async def get_mia_status(self) -> Dict[str, Any]:
         """Get MIA system status."""
         try:
-            response = await self.client.get(f"{self.mia_base_url}/status")
+            response = await self.client.get("/status")
             response.raise_for_status()
-            return response.json()
+            return json_loads(response.content)
         except httpx.HTTPError as e:
             logger.error(f"Failed to get MIA status: {e}")
             return {"error": f"Failed to get status: {e}"}
@@ -142,276 +198,307 @@ async def serve(
 ) -> None:
     """Main MCP server function for ElevenLabs voice integration."""
 
-    # Initialize clients
-    elevenlabs_client = ElevenLabsClient(api_key=elevenlabs_api_key)
-    voice_profiles = VoiceProfileManager()
-    mia_integration = MIAVoiceIntegration(host=mia_host, port=mia_port)
-
-    async with elevenlabs_client, mia_integration:
-        server = Server("mcp-elevenlabs-mia")
-
-        @server.list_tools()
-        async def list_tools() -> List[Tool]:
-            """List available voice and MIA integration tools."""
-            return [
-                Tool(
-                    name=ElevenLabsTools.LIST_VOICES,
-                    description="List all available ElevenLabs voices",
-                    inputSchema=ListVoices.schema(),
-                ),
-                Tool(
-                    name=ElevenLabsTools.GET_VOICE_DETAILS,
-                    description="Get detailed information about a specific voice",
-                    inputSchema=GetVoiceDetails.schema(),
-                ),
-                Tool(
-                    name=ElevenLabsTools.GENERATE_SPEECH,
-                    description="Convert text to speech using ElevenLabs",
-                    inputSchema=GenerateSpeech.schema(),
-                ),
-                Tool(
-                    name=ElevenLabsTools.CREATE_VOICE_PROFILE,
-                    description="Create a reusable voice profile with specific settings",
-                    inputSchema=CreateVoiceProfile.schema(),
-                ),
-                Tool(
-                    name=ElevenLabsTools.LIST_VOICE_PROFILES,
-                    description="List all saved voice profiles",
-                    inputSchema=ListVoiceProfiles.schema(),
-                ),
-                Tool(
-                    name=ElevenLabsTools.GENERATE_SPEECH_FROM_PROFILE,
-                    description="Generate speech using a saved voice profile",
-                    inputSchema=GenerateSpeechFromProfile.schema(),
-                ),
-                Tool(
-                    name=ElevenLabsTools.MIA_VOICE_COMMAND,
-                    description="Execute a voice command to control MIA IoT devices",
-                    inputSchema=MIAVoiceCommand.schema(),
-                ),
-                Tool(
-                    name=ElevenLabsTools.GET_MIA_STATUS,
-                    description="Get MIA system status with voice feedback",
-                    inputSchema=GetMIAStatus.schema(),
-                ),
-            ]
-
-        @server.call_tool()
-        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
-            """Execute voice and MIA integration commands."""
-
-            try:
-                match name:
-                    case ElevenLabsTools.LIST_VOICES:
-                        voices = await elevenlabs_client.get_voices()
-                        voices_text = "\n".join([
-                            f"- {voice['name']} (ID: {voice['voice_id']}, Category: {voice.get('category', 'unknown')})"
-                            for voice in voices
-                        ])
-                        return [TextContent(
-                            type="text",
-                            text=f"Available voices:\n{voices_text}"
-                        )]
-
-                    case ElevenLabsTools.GET_VOICE_DETAILS:
-                        voice_id = arguments["voice_id"]
-                        voice_details = await elevenlabs_client.get_voice(voice_id)
-                        if voice_details:
-                            return [TextContent(
-                                type="text",
-                                text=f"Voice details:\n{json.dumps(voice_details, indent=2)}"
-                            )]
-                        else:
-                            return [TextContent(
-                                type="text",
-                                text=f"Voice {voice_id} not found"
-                            )]
-
-                    case ElevenLabsTools.GENERATE_SPEECH:
-                        text = arguments["text"]
-                        voice_id = arguments["voice_id"]
-                        model_id = arguments.get("model_id", "eleven_monolingual_v1")
-                        stability = arguments.get("stability", 0.5)
-                        similarity_boost = arguments.get("similarity_boost", 0.5)
-
-                        voice_settings = {
-                            "stability": stability,
-                            "similarity_boost": similarity_boost
-                        }
-
-                        audio_data = await elevenlabs_client.generate_speech(
-                            text, voice_id, model_id, voice_settings
+    try:
+        # Initialize clients
+        elevenlabs_client = ElevenLabsClient(api_key=elevenlabs_api_key)
+        voice_profiles = VoiceProfileManager()
+        speech_cache = SpeechCache(voice_profiles.config_dir)
+        mia_integration = MIAVoiceIntegration(mia_host=mia_host, mia_port=mia_port)
+
+        async with elevenlabs_client, mia_integration:
+            server = Server("mcp-elevenlabs-mia")
+
+            @server.list_tools()
+            async def list_tools() -> List[Tool]:
+                """List available voice and MIA integration tools."""
+                return _TOOLS
+
+            async def synthesize_to_file(
+                text: str,
+                voice_id: str,
+                model_id: str,
+                voice_settings: Dict[str, Any],
+                build_payload: Optional[Callable[[], Optional[bytes]]] = None
+            ) -> Optional[str]:
+                """Return the path of an audio file with the generated speech.
+
+                Identical requests are served from the speech cache; otherwise the
+                audio is streamed into a new cache entry. build_payload, if given,
+                produces a pre-serialized request body and is only called on a miss.
+                """
+                key = speech_cache.key(text, voice_id, model_id, voice_settings)
+                cached_path = await asyncio.to_thread(speech_cache.get, key)
+                if cached_path:
+                    return str(cached_path)
+
+                payload_bytes = build_payload() if build_payload else None
+                temp_file = await asyncio.to_thread(speech_cache.new_entry)
+                streamed = False
+                try:
+                    with temp_file:
+                        streamed = await elevenlabs_client.stream_speech(
+                            text, voice_id,
+                            sink=lambda chunk: asyncio.to_thread(temp_file.write, chunk),
+                            model_id=model_id,
+                            voice_settings=voice_settings,
+                            payload_bytes=payload_bytes
                         )
+                finally:
+                    # Don't leave partial audio behind on failure or cancellation
+                    if not streamed:
+                        os.unlink(temp_file.name)
+
+                if not streamed:
+                    return None
+                path = await asyncio.to_thread(speech_cache.commit, temp_file.name, key)
+                return str(path)
+
+            async def synthesize_with_profile(text: str, profile_name: str) -> Optional[str]:
+                """Like synthesize_to_file(), using a saved voice profile's settings."""
+                profile = voice_profiles.get_profile(profile_name)
+                if not profile:
+                    return None
+
+                model_id = "eleven_monolingual_v1"
+                return await synthesize_to_file(
+                    text, profile["voice_id"], model_id, profile["settings"],
+                    build_payload=lambda: voice_profiles.speech_payload(profile_name, text, model_id)
+                )
+
+            async def with_preamble(
+                request: Awaitable[Dict[str, Any]],
+                preamble_text: str,
+                profile_name: str
+            ) -> Tuple[Dict[str, Any], Optional[str]]:
+                """Run a MIA request while synthesizing a fixed preamble alongside it.
+
+                preamble_text must not depend on the request, so after the first
+                call it is served from the speech cache. It is optional, so a
+                failed preamble is logged and dropped.
+                """
+                if not voice_profiles.get_profile(profile_name):
+                    return await request, None
+
+                async def synthesize_preamble() -> Optional[str]:
+                    try:
+                        return await synthesize_with_profile(preamble_text, profile_name)
+                    except Exception as e:
+                        logger.error(f"Failed to synthesize preamble: {e}")
+                        return None
+
+                result, preamble_path = await asyncio.gather(request, synthesize_preamble())
+                return result, preamble_path
+
+            async def handle_list_voices(arguments: Dict[str, Any]) -> List[TextContent]:
+                """List available ElevenLabs voices."""
+                voices = await elevenlabs_client.get_voices()
+                voices_text = "\n".join(
+                    f"- {voice_name} (ID: {voice_id}, Category: {voice.get('category', 'unknown')})"
+                    for voice, (voice_name, voice_id) in zip(voices, map(_voice_name_and_id, voices))
+                )
+                return [TextContent(
+                    type="text",
+                    text=f"Available voices:\n{voices_text}"
+                )]
 
-                        if audio_data:
-                            # Save audio to temporary file and return path
-                            with tempfile.NamedTemporaryFile(
-                                suffix=".mp3", delete=False
-                            ) as temp_file:
-                                temp_file.write(audio_data)
-                                temp_path = temp_file.name
-
-                            return [TextContent(
-                                type="text",
-                                text=f"Speech generated successfully. Audio saved to: {temp_path}\nText: '{text}'"
-                            )]
-                        else:
-                            return [TextContent(
-                                type="text",
-                                text="Failed to generate speech"
-                            )]
-
-                    case ElevenLabsTools.CREATE_VOICE_PROFILE:
-                        name = arguments["name"]
-                        voice_id = arguments["voice_id"]
-                        stability = arguments.get("stability", 0.5)
-                        similarity_boost = arguments.get("similarity_boost", 0.5)
-
-                        settings = {
-                            "stability": stability,
-                            "similarity_boost": similarity_boost
-                        }
-
-                        voice_profiles.create_profile(name, voice_id, settings)
-                        return [TextContent(
-                            type="text",
-                            text=f"Voice profile '{name}' created with voice ID '{voice_id}'"
-                        )]
-
-                    case ElevenLabsTools.LIST_VOICE_PROFILES:
-                        profiles = voice_profiles.list_profiles()
-                        if profiles:
-                            profiles_text = "\n".join([f"- {profile}" for profile in profiles])
-                            return [TextContent(
-                                type="text",
-                                text=f"Saved voice profiles:\n{profiles_text}"
-                            )]
-                        else:
-                            return [TextContent(
-                                type="text",
-                                text="No voice profiles saved yet"
-                            )]
-
-                    case ElevenLabsTools.GENERATE_SPEECH_FROM_PROFILE:
-                        text = arguments["text"]
-                        profile_name = arguments["profile_name"]
-
-                        profile = voice_profiles.get_profile(profile_name)
-                        if not profile:
-                            return [TextContent(
-                                type="text",
-                                text=f"Voice profile '{profile_name}' not found"
-                            )]
-
-                        voice_id = profile["voice_id"]
-                        settings = profile["settings"]
-
-                        audio_data = await elevenlabs_client.generate_speech(
-                            text, voice_id, "eleven_monolingual_v1", settings
-                        )
+            async def handle_get_voice_details(arguments: Dict[str, Any]) -> List[TextContent]:
+                """Describe a single ElevenLabs voice."""
+                voice_id = arguments["voice_id"]
+                voice_details = await elevenlabs_client.get_voice(voice_id)
+                if voice_details:
+                    return [TextContent(
+                        type="text",
+                        text=f"Voice details:\n{json.dumps(voice_details, indent=2)}"
+                    )]
+                else:
+                    return [TextContent(
+                        type="text",
+                        text=f"Voice {voice_id} not found"
+                    )]
+
+            async def handle_generate_speech(arguments: Dict[str, Any]) -> List[TextContent]:
+                """Convert text to speech with explicit voice settings."""
+                text = arguments["text"]
+                voice_id = arguments["voice_id"]
+                model_id = arguments.get("model_id", "eleven_monolingual_v1")
+                stability = arguments.get("stability", 0.5)
+                similarity_boost = arguments.get("similarity_boost", 0.5)
+
+                voice_settings = {
+                    "stability": stability,
+                    "similarity_boost": similarity_boost
+                }
+
+                # Stream audio into a temporary file and return its path
+                temp_path = await synthesize_to_file(
+                    text, voice_id, model_id, voice_settings
+                )
+
+                if temp_path:
+                    return [TextContent(
+                        type="text",
+                        text=f"Speech generated successfully. Audio saved to: {temp_path}\nText: '{text}'"
+                    )]
+                else:
+                    return [TextContent(
+                        type="text",
+                        text="Failed to generate speech"
+                    )]
+
+            async def handle_create_voice_profile(arguments: Dict[str, Any]) -> List[TextContent]:
+                """Save a reusable voice profile."""
+                name = arguments["name"]
+                voice_id = arguments["voice_id"]
+                stability = arguments.get("stability", 0.5)
+                similarity_boost = arguments.get("similarity_boost", 0.5)
+
+                settings = {
+                    "stability": stability,
+                    "similarity_boost": similarity_boost
+                }
+
+                await voice_profiles.acreate_profile(name, voice_id, settings)
+                return [TextContent(
+                    type="text",
+                    text=f"Voice profile '{name}' created with voice ID '{voice_id}'"
+                )]
 
-                        if audio_data:
-                            with tempfile.NamedTemporaryFile(
-                                suffix=".mp3", delete=False
-                            ) as temp_file:
-                                temp_file.write(audio_data)
-                                temp_path = temp_file.name
-
-                            return [TextContent(
-                                type="text",
-                                text=f"Speech generated from profile '{profile_name}'. Audio saved to: {temp_path}\nText: '{text}'"
-                            )]
-                        else:
-                            return [TextContent(
-                                type="text",
-                                text="Failed to generate speech from profile"
-                            )]
-
-                    case ElevenLabsTools.MIA_VOICE_COMMAND:
-                        command = arguments["command"]
-                        voice_profile = arguments.get("voice_profile", "default")
-
-                        # Execute the voice command
-                        result = await mia_integration.execute_voice_command(command)
-
-                        # Generate voice response
-                        response_text = f"Voice command executed: {command}"
-                        if "error" not in result:
-                            response_text += ". Command completed successfully."
-                        else:
-                            response_text += f". Error: {result['error']}"
-
-                        # Generate speech response
-                        profile = voice_profiles.get_profile(voice_profile)
-                        if profile:
-                            audio_data = await elevenlabs_client.generate_speech(
-                                response_text, profile["voice_id"], "eleven_monolingual_v1", profile["settings"]
-                            )
-                            if audio_data:
-                                with tempfile.NamedTemporaryFile(
-                                    suffix=".mp3", delete=False
-                                ) as temp_file:
-                                    temp_file.write(audio_data)
-                                    temp_path = temp_file.name
-                                response_text += f"\nVoice response saved to: {temp_path}"
-
-                        return [TextContent(
-                            type="text",
-                            text=response_text
-                        )]
-
-                    case ElevenLabsTools.GET_MIA_STATUS:
-                        voice_profile = arguments.get("voice_profile", "default")
-
-                        # Get MIA status
-                        status = await mia_integration.get_mia_status()
-
-                        # Format status for voice readout
-                        if "error" in status:
-                            status_text = f"MIA system status unavailable: {status['error']}"
-                        else:
-                            # Create a natural language status summary
-                            status_text = "MIA system status: "
-                            if status.get("healthy", False):
-                                status_text += "System is healthy. "
-                            else:
-                                status_text += "System has issues. "
-
-                            devices = status.get("devices", [])
-                            status_text += f"{len(devices)} devices connected."
-
-                        # Generate voice response
-                        profile = voice_profiles.get_profile(voice_profile)
-                        if profile:
-                            audio_data = await elevenlabs_client.generate_speech(
-                                status_text, profile["voice_id"], "eleven_monolingual_v1", profile["settings"]
-                            )
-                            if audio_data:
-                                with tempfile.NamedTemporaryFile(
-                                    suffix=".mp3", delete=False
-                                ) as temp_file:
-                                    temp_file.write(audio_data)
-                                    temp_path = temp_file.name
-                                status_text += f"\nVoice status saved to: {temp_path}"
-
-                        return [TextContent(
-                            type="text",
-                            text=status_text
-                        )]
-
-                    case _:
-                        raise ValueError(f"Unknown tool: {name}")
+            async def handle_list_voice_profiles(arguments: Dict[str, Any]) -> List[TextContent]:
+                """List saved voice profiles."""
+                profiles = voice_profiles.list_profiles()
+                if profiles:
+                    profiles_text = "\n".join([f"- {profile}" for profile in profiles])
+                    return [TextContent(
+                        type="text",
+                        text=f"Saved voice profiles:\n{profiles_text}"
+                    )]
+                else:
+                    return [TextContent(
+                        type="text",
+                        text="No voice profiles saved yet"
+                    )]
+
+            async def handle_generate_speech_from_profile(arguments: Dict[str, Any]) -> List[TextContent]:
+                """Convert text to speech with a saved voice profile."""
+                text = arguments["text"]
+                profile_name = arguments["profile_name"]
+
+                profile = voice_profiles.get_profile(profile_name)
+                if not profile:
+                    return [TextContent(
+                        type="text",
+                        text=f"Voice profile '{profile_name}' not found"
+                    )]
+
+                temp_path = await synthesize_with_profile(text, profile_name)
+
+                if temp_path:
+                    return [TextContent(
+                        type="text",
+                        text=f"Speech generated from profile '{profile_name}'. Audio saved to: {temp_path}\nText: '{text}'"
+                    )]
+                else:
+                    return [TextContent(
+                        type="text",
+                        text="Failed to generate speech from profile"
+                    )]
+
+            async def handle_mia_voice_command(arguments: Dict[str, Any]) -> List[TextContent]:
+                """Execute a MIA voice command and speak the outcome."""
+                command = arguments["command"]
+                voice_profile = arguments.get("voice_profile", "default")
+
+                # Execute the voice command
+                result = await mia_integration.execute_voice_command(command)
+
+                # Generate voice response
+                response_text = f"Voice command executed: {command}"
+                if "error" not in result:
+                    response_text += ". Command completed successfully."
+                else:
+                    response_text += f". Error: {result['error']}"
+
+                # Generate speech response
+                temp_path = await synthesize_with_profile(response_text, voice_profile)
+                if temp_path:
+                    response_text += f"\nVoice response saved to: {temp_path}"
 
-            except Exception as e:
-                logger.error(f"Error executing tool {name}: {e}")
                 return [TextContent(
                     type="text",
-                    text=f"Error executing {name}: {str(e)}"
+                    text=response_text
                 )]
 
-        # Create server options
-        options = server.create_initialization_options()
+            async def handle_get_mia_status(arguments: Dict[str, Any]) -> List[TextContent]:
+                """Read out the MIA system status."""
+                voice_profile = arguments.get("voice_profile", "default")
+
+                # Get MIA status while the preamble is synthesized
+                status, preamble_path = await with_preamble(
+                    mia_integration.get_mia_status(),
+                    "Checking MIA system status.",
+                    voice_profile
+                )
+
+                # Format status for voice readout
+                if "error" in status:
+                    status_text = f"MIA system status unavailable: {status['error']}"
+                else:
+                    # Create a natural language status summary
+                    status_text = "MIA system status: "
+                    if status.get("healthy", False):
+                        status_text += "System is healthy. "
+                    else:
+                        status_text += "System has issues. "
+
+                    devices = status.get("devices", [])
+                    status_text += f"{len(devices)} devices connected."
+
+                # Generate voice response
+                temp_path = await synthesize_with_profile(status_text, voice_profile)
+                if temp_path:
+                    status_text += f"\nVoice status saved to: {temp_path}"
+
+                if preamble_path:
+                    status_text += f"\nVoice preamble saved to: {preamble_path}"
+
+                return [TextContent(
+                    type="text",
+                    text=status_text
+                )]
 
-        # Run the server
-        async with stdio_server() as (read_stream, write_stream):
-            await server.run(read_stream, write_stream, options, raise_exceptions=True)
\ No newline at end of file
+            handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[List[TextContent]]]] = {
+                ElevenLabsTools.LIST_VOICES: handle_list_voices,
+                ElevenLabsTools.GET_VOICE_DETAILS: handle_get_voice_details,
+                ElevenLabsTools.GENERATE_SPEECH: handle_generate_speech,
+                ElevenLabsTools.CREATE_VOICE_PROFILE: handle_create_voice_profile,
+                ElevenLabsTools.LIST_VOICE_PROFILES: handle_list_voice_profiles,
+                ElevenLabsTools.GENERATE_SPEECH_FROM_PROFILE: handle_generate_speech_from_profile,
+                ElevenLabsTools.MIA_VOICE_COMMAND: handle_mia_voice_command,
+                ElevenLabsTools.GET_MIA_STATUS: handle_get_mia_status,
+            }
+
+            @server.call_tool()
+            async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+                """Execute voice and MIA integration commands."""
+
+                try:
+                    handler = handlers.get(name)
+                    if handler is None:
+                        raise ValueError(f"Unknown tool: {name}")
+                    return await handler(arguments)
+
+                except Exception as e:
+                    logger.error(f"Error executing tool {name}: {e}")
+                    return [TextContent(
+                        type="text",
+                        text=f"Error executing {name}: {str(e)}"
+                    )]
+
+            # Create server options
+            options = server.create_initialization_options()
+
+            # Run the server
+            async with stdio_server() as (read_stream, write_stream):
+                await server.run(read_stream, write_stream, options, raise_exceptions=True)
+    finally:
+        await close_http_client()
@@ -2,39 +2,43 @@
 Tests for ElevenLabs client functionality.
 """
 
+import asyncio
+import json
+import os
+
+import httpx
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import sys
 from pathlib import Path
 
-# Add src to path for imports
-src_path = Path(__file__).parent.parent / "src"
-sys.path.insert(0, str(src_path))
+# Add the repository root to path so the src package's relative imports resolve
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
 
-from elevenlabs_client import ElevenLabsClient, VoiceProfileManager
+from src.elevenlabs_client import ElevenLabsClient, SpeechCache, VoiceProfileManager
 
 
 class TestElevenLabsClient:
     """Test ElevenLabs API client."""
 
     @pytest.fixture
-    async def client(self):
+    def client(self):
         """Create test client."""
         client = ElevenLabsClient(api_key="test-key")
         # Mock the httpx client
         client.client = AsyncMock()
-        yield client
-        await client.client.aclose()
+        return client
 
     @pytest.mark.asyncio
     async def test_get_voices_success(self, client):
         """Test successful voice listing."""
         mock_response = MagicMock()
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "voices": [
                 {"name": "Test Voice", "voice_id": "test-123", "category": "premade"}
             ]
-        }
+        }).encode()
         mock_response.raise_for_status.return_value = None
         client.client.get.return_value = mock_response
 
@@ -44,6 +48,55 @@ class TestElevenLabsClient:
         assert voices[0]["name"] == "Test Voice"
         client.client.get.assert_called_once_with("/v1/voices")
 
+    @pytest.mark.asyncio
+    async def test_get_voices_cached(self, client):
+        """Test voice listing is served from cache until refreshed."""
+        mock_response = MagicMock()
+        mock_response.content = json.dumps({
+            "voices": [
+                {"name": "Test Voice", "voice_id": "test-123", "category": "premade"}
+            ]
+        }).encode()
+        mock_response.raise_for_status.return_value = None
+        client.client.get.return_value = mock_response
+
+        first = await client.get_voices()
+        second = await client.get_voices()
+
+        assert first == second
+        assert client.client.get.call_count == 1
+
+        await client.refresh_voices()
+        assert client.client.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_voices_error_not_cached(self, client):
+        """Test failed voice listings are retried on the next call."""
+        client.client.get.side_effect = httpx.ConnectError("boom")
+
+        assert await client.get_voices() == []
+        assert await client.get_voices() == []
+        assert client.client.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_voices_detailed(self, client):
+        """Test voice details are fetched concurrently, keeping partial results."""
+        async def fake_get(path):
+            if path.endswith("/bad"):
+                raise httpx.ConnectError("boom")
+            if path.endswith("/cancelled"):
+                raise asyncio.CancelledError()
+            response = MagicMock()
+            response.content = json.dumps({"voice_id": path.rsplit("/", 1)[1]}).encode()
+            response.raise_for_status.return_value = None
+            return response
+
+        client.client.get.side_effect = fake_get
+
+        details = await client.get_voices_detailed(["a", "bad", "cancelled", "b"])
+
+        assert details == [{"voice_id": "a"}, None, None, {"voice_id": "b"}]
+
     @pytest.mark.asyncio
     async def test_generate_speech_success(self, client):
         """Test successful speech generation."""
@@ -58,8 +111,134 @@ class TestElevenLabsClient:
         client.client.post.assert_called_once()
         call_args = client.client.post.call_args
         assert call_args[0][0] == "/v1/text-to-speech/voice-123"
-        assert "text" in call_args[1]["json"]
-        assert call_args[1]["json"]["text"] == "Hello world"
+        payload = json.loads(call_args[1]["content"])
+        assert payload["text"] == "Hello world"
+
+    @pytest.mark.asyncio
+    async def test_generate_speech_concurrent_batch(self, client):
+        """Test concurrent speech requests are dispatched and resolved together."""
+        async def fake_post(path, **kwargs):
+            response = MagicMock()
+            response.content = json.loads(kwargs["content"])["text"].encode()
+            response.raise_for_status.return_value = None
+            return response
+
+        client.client.post.side_effect = fake_post
+
+        texts = [f"line {i}" for i in range(client.TTS_BATCH_SIZE + 2)]
+        audio = await asyncio.gather(
+            *(client.generate_speech(text, "voice-123") for text in texts)
+        )
+
+        assert audio == [text.encode() for text in texts]
+        assert client.client.post.call_count == len(texts)
+
+    @pytest.mark.asyncio
+    async def test_synth_many_bounded(self, client):
+        """Test bulk synthesis keeps order and caps in-flight requests."""
+        in_flight = 0
+        peak = 0
+
+        async def fake_post(path, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            response = MagicMock()
+            response.content = json.loads(kwargs["content"])["text"].encode()
+            response.raise_for_status.return_value = None
+            return response
+
+        client.client.post.side_effect = fake_post
+
+        jobs = [{"text": f"line {i}", "voice_id": "voice-123"} for i in range(20)]
+        audio = await client.synth_many(jobs)
+
+        assert audio == [job["text"].encode() for job in jobs]
+        assert peak <= client.SYNTH_CONCURRENCY
+
+    @pytest.mark.asyncio
+    async def test_synth_many_failure_settles_remaining_jobs(self, client):
+        """Test a failing job leaves no other synth_many jobs running."""
+        async def fake_post(path, **kwargs):
+            if json.loads(kwargs["content"])["text"] == "bad":
+                raise RuntimeError("boom")
+            await asyncio.Event().wait()
+
+        client.client.post.side_effect = fake_post
+
+        jobs = [{"text": text, "voice_id": "voice-123"} for text in ("slow", "bad", "slow")]
+        with pytest.raises(RuntimeError):
+            await client.synth_many(jobs)
+
+        running = [
+            task for task in asyncio.all_tasks()
+            if task.get_coro().__qualname__ == "ElevenLabsClient.generate_speech"
+        ]
+        assert running == []
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_generate_speech_retries_rate_limit(self, client):
+        """Test a 429 is retried after the Retry-After delay."""
+        limited = httpx.Response(429, headers={"Retry-After": "0"}, request=httpx.Request("POST", "/"))
+        ok = httpx.Response(200, content=b"audio-data", request=httpx.Request("POST", "/"))
+        client.client.post.side_effect = [limited, ok]
+
+        audio = await client.generate_speech("Hello", "voice-123")
+
+        assert audio == b"audio-data"
+        assert client.client.post.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_generate_speech_gives_up_after_max_attempts(self, client):
+        """Test repeated zero Retry-After responses stop after RETRY_MAX_ATTEMPTS."""
+        client.RETRY_MIN_DELAY = 0.001
+        limited = httpx.Response(429, headers={"Retry-After": "0"}, request=httpx.Request("POST", "/"))
+        client.client.post.return_value = limited
+
+        audio = await client.generate_speech("Hello", "voice-123")
+
+        assert audio is None
+        assert client.client.post.call_count == client.RETRY_MAX_ATTEMPTS + 1
+
+    @pytest.mark.asyncio
+    async def test_generate_speech_gives_up_past_max_wait(self, client):
+        """Test retries stop when Retry-After exceeds the total wait budget."""
+        limited = httpx.Response(429, headers={"Retry-After": "60"}, request=httpx.Request("POST", "/"))
+        client.client.post.return_value = limited
+
+        audio = await client.generate_speech("Hello", "voice-123")
+
+        assert audio is None
+        assert client.client.post.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_speech_request_does_not_block_later_ones(self, client):
+        """Test a fast request queued behind a slow one finishes first."""
+        release_slow = asyncio.Event()
+
+        async def fake_post(path, **kwargs):
+            text = json.loads(kwargs["content"])["text"]
+            if text == "slow":
+                await release_slow.wait()
+            response = MagicMock()
+            response.content = text.encode()
+            response.raise_for_status.return_value = None
+            return response
+
+        client.client.post.side_effect = fake_post
+
+        slow = asyncio.create_task(client.generate_speech("slow", "voice-123"))
+        await asyncio.sleep(client.TTS_BATCH_WINDOW * 5)
+
+        fast = await asyncio.wait_for(client.generate_speech("fast", "voice-123"), timeout=1.0)
+        assert fast == b"fast"
+        assert not slow.done()
+
+        release_slow.set()
+        assert await slow == b"slow"
 
     @pytest.mark.asyncio
     async def test_generate_speech_with_settings(self, client):
@@ -75,11 +254,57 @@ class TestElevenLabsClient:
         )
 
         call_args = client.client.post.call_args
-        payload = call_args[1]["json"]
+        payload = json.loads(call_args[1]["content"])
         assert payload["model_id"] == "model-456"
         assert payload["voice_settings"]["stability"] == 0.8
         assert payload["voice_settings"]["similarity_boost"] == 0.7
 
+    @pytest.mark.asyncio
+    async def test_generate_speech_with_payload_bytes(self, client):
+        """Test a pre-serialized payload is sent without re-encoding."""
+        mock_response = MagicMock()
+        mock_response.content = b"audio-data"
+        mock_response.raise_for_status.return_value = None
+        client.client.post.return_value = mock_response
+
+        template = ElevenLabsClient.speech_payload_template("model-456", {"stability": 0.8})
+        payload = ElevenLabsClient.render_speech_payload(template, 'Say "hi"')
+        await client.generate_speech('Say "hi"', "voice-123", payload_bytes=payload)
+
+        call_args = client.client.post.call_args
+        assert call_args[1]["content"] == payload
+        assert json.loads(payload) == {
+            "text": 'Say "hi"',
+            "model_id": "model-456",
+            "voice_settings": {"stability": 0.8}
+        }
+
+    @pytest.mark.asyncio
+    async def test_stream_speech_success(self, client):
+        """Test streaming speech chunks to a sink."""
+        async def fake_chunks(chunk_size):
+            for chunk in (b"fake-", b"audio-", b"data"):
+                yield chunk
+
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.aiter_bytes = fake_chunks
+        client.client.stream = MagicMock()
+        client.client.stream.return_value.__aenter__.return_value = mock_response
+
+        received = []
+
+        async def sink(chunk):
+            received.append(chunk)
+
+        streamed = await client.stream_speech("Hello world", "voice-123", sink)
+
+        assert streamed is True
+        assert b"".join(received) == b"fake-audio-data"
+        call_args = client.client.stream.call_args
+        assert call_args[0] == ("POST", "/v1/text-to-speech/voice-123")
+        assert json.loads(call_args[1]["content"])["text"] == "Hello world"
+
 
 class TestVoiceProfileManager:
     """Test voice profile management."""
@@ -117,11 +342,165 @@ class TestVoiceProfileManager:
         manager.delete_profile("to-delete")
         assert "to-delete" not in manager.list_profiles()
 
+    def test_profiles_persisted(self, manager, tmp_path):
+        """Test profiles survive a reload from disk."""
+        manager.create_profile("saved", "voice-123", {"stability": 0.6})
+
+        reloaded = VoiceProfileManager(config_dir=tmp_path)
+        assert reloaded.get_profile("saved")["voice_id"] == "voice-123"
+        assert reloaded.get_profile("saved")["settings"]["stability"] == 0.6
+
+    def test_speech_payload_from_profile(self, manager):
+        """Test profile payloads carry the text and the profile's settings."""
+        manager.create_profile("narrator", "voice-123", {"stability": 0.9})
+
+        payload = json.loads(manager.speech_payload("narrator", "Hello"))
+        assert payload["text"] == "Hello"
+        assert payload["voice_settings"] == {"stability": 0.9}
+
+        manager.create_profile("narrator", "voice-123", {"stability": 0.1})
+        payload = json.loads(manager.speech_payload("narrator", "Hello"))
+        assert payload["voice_settings"] == {"stability": 0.1}
+
+        assert manager.speech_payload("missing", "Hello") is None
+
+    def test_load_empty_profiles_file(self, tmp_path):
+        """Test an empty profiles file loads as no profiles."""
+        (tmp_path / "voice_profiles.json").write_bytes(b"")
+
+        manager = VoiceProfileManager(config_dir=tmp_path)
+        assert manager.list_profiles() == []
+
+    def test_load_large_profiles_file(self, manager, tmp_path):
+        """Test profiles files above the mmap threshold still load."""
+        manager.create_profile("large", "voice-123", {})
+
+        with patch.object(VoiceProfileManager, "MMAP_THRESHOLD", 0):
+            reloaded = VoiceProfileManager(config_dir=tmp_path)
+        assert reloaded.get_profile("large")["voice_id"] == "voice-123"
+
+    def test_profile_saved_inside_event_loop(self, tmp_path):
+        """Test create_profile is on disk before asyncio.run returns."""
+        async def main():
+            VoiceProfileManager(config_dir=tmp_path).create_profile("loop", "voice-123", {})
+
+        asyncio.run(main())
+
+        reloaded = VoiceProfileManager(config_dir=tmp_path)
+        assert reloaded.list_profiles() == ["loop"]
+
+    @pytest.mark.asyncio
+    async def test_async_create_and_delete_profile(self, manager, tmp_path):
+        """Test async profile changes are on disk once awaited."""
+        await manager.acreate_profile("async-profile", "voice-123", {"stability": 0.4})
+        reloaded = VoiceProfileManager(config_dir=tmp_path)
+        assert reloaded.get_profile("async-profile")["voice_id"] == "voice-123"
+
+        await manager.adelete_profile("async-profile")
+        reloaded = VoiceProfileManager(config_dir=tmp_path)
+        assert reloaded.get_profile("async-profile") is None
+
+    @pytest.mark.asyncio
+    async def test_unencodable_settings_are_logged_not_raised(self, manager):
+        """Test settings the JSON encoder rejects fail the save, not the caller."""
+        settings = {"seed": 2 ** 70}
+
+        manager.create_profile("sync-profile", "voice-123", settings)
+        await manager.acreate_profile("async-profile", "voice-123", settings)
+
+        assert manager.get_profile("sync-profile")["settings"] == settings
+        assert manager.get_profile("async-profile")["settings"] == settings
+
     def test_get_nonexistent_profile(self, manager):
         """Test retrieving nonexistent profile."""
         profile = manager.get_profile("nonexistent")
         assert profile is None
 
 
+class TestSpeechCache:
+    """Test the on-disk speech cache."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create test speech cache."""
+        return SpeechCache(config_dir=tmp_path, max_size=10)
+
+    def _store(self, cache, key, data):
+        with cache.new_entry() as entry:
+            entry.write(data)
+        return cache.commit(entry.name, key)
+
+    def test_key_ignores_settings_order(self):
+        """Test keys depend on settings content, not insertion order."""
+        a = SpeechCache.key("Hi", "voice-1", "model-1", {"stability": 0.5, "similarity_boost": 0.7})
+        b = SpeechCache.key("Hi", "voice-1", "model-1", {"similarity_boost": 0.7, "stability": 0.5})
+        c = SpeechCache.key("Hello", "voice-1", "model-1", {"stability": 0.5, "similarity_boost": 0.7})
+        assert a == b
+        assert a != c
+
+    def test_store_and_get(self, cache):
+        """Test committed entries are returned on lookup."""
+        assert cache.get("abc") is None
+
+        path = self._store(cache, "abc", b"audio")
+
+        assert cache.get("abc") == path
+        assert path.read_bytes() == b"audio"
+        assert not list(cache.cache_dir.glob("*.part"))
+
+    def test_stale_entry_expires(self, cache):
+        """Test entries older than max_age are treated as misses."""
+        path = self._store(cache, "old", b"audio")
+        os.utime(path, (0, 0))
+
+        assert cache.get("old") is None
+        assert not path.exists()
+
+    def test_evicts_least_recently_used(self, cache):
+        """Test the cache is trimmed to max_size, dropping the oldest entries."""
+        first = self._store(cache, "first", b"12345")
+        os.utime(first, (1, first.stat().st_mtime))
+        second = self._store(cache, "second", b"12345")
+        third = self._store(cache, "third", b"12345")
+
+        assert not first.exists()
+        assert second.exists()
+        assert third.exists()
+
+    def test_oversized_entry_survives_its_commit(self, cache):
+        """Test an entry larger than max_size is not evicted by its own commit."""
+        path = self._store(cache, "big", b"12345678901")
+
+        assert path.exists()
+        assert cache.get("big") == path
+
+    def test_partial_entries_count_towards_size(self, cache):
+        """Test abandoned partial entries are removed and live ones are counted."""
+        abandoned = cache.cache_dir / "abandoned.part"
+        abandoned.write_bytes(b"12345")
+        os.utime(abandoned, (0, 0))
+        writing = cache.cache_dir / "writing.part"
+        writing.write_bytes(b"123456")
+
+        first = self._store(cache, "first", b"12345")
+        os.utime(first, (1, first.stat().st_mtime))
+        second = self._store(cache, "second", b"12345")
+
+        assert not abandoned.exists()
+        assert writing.exists()
+        assert not first.exists()
+        assert second.exists()
+
+    def test_commit_within_size_skips_rescan(self, cache):
+        """Test the directory is only rescanned once the cap may be exceeded."""
+        with patch.object(cache, "_evict", wraps=cache._evict) as evict:
+            self._store(cache, "first", b"123")
+            self._store(cache, "second", b"123")
+            assert evict.call_count == 1
+
+            self._store(cache, "third", b"12345")
+            assert evict.call_count == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+Tests for the ElevenLabs MCP server.
+"""
+
+import asyncio
+
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+from pathlib import Path
+
+# Add the repository root to path so the src package's relative imports resolve
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+from src import mcp_server
+from src.elevenlabs_client import VoiceProfileManager
+
+
+class TestServe:
+    """Test MCP server startup."""
+
+    @pytest.mark.asyncio
+    async def test_serve_reaches_server_run(self, tmp_path):
+        """Test serve() builds its clients and starts the MCP server."""
+        read_stream, write_stream = MagicMock(), MagicMock()
+
+        @asynccontextmanager
+        async def fake_stdio_server():
+            yield read_stream, write_stream
+
+        with patch.object(mcp_server, "stdio_server", fake_stdio_server), \
+                patch.object(mcp_server, "VoiceProfileManager",
+                             lambda: VoiceProfileManager(config_dir=tmp_path)), \
+                patch.object(mcp_server.Server, "run", new_callable=AsyncMock) as run:
+            await mcp_server.serve(
+                elevenlabs_api_key="test-key",
+                mia_host="mia.local",
+                mia_port=9000
+            )
+
+        run.assert_awaited_once()
+        assert run.call_args[0][:2] == (read_stream, write_stream)
+
+
+class FakeServer:
+    """Stand-in for the MCP Server that captures the registered handlers."""
+
+    def __init__(self, name):
+        self.handlers = {}
+
+    def list_tools(self):
+        return self._register("list_tools")
+
+    def call_tool(self):
+        return self._register("call_tool")
+
+    def _register(self, kind):
+        def decorator(func):
+            self.handlers[kind] = func
+            return func
+        return decorator
+
+    def create_initialization_options(self):
+        return None
+
+
+class TestCallTool:
+    """Test MCP tool handlers."""
+
+    async def _run_tool(self, tmp_path, name, arguments, profiles):
+        """Start serve() and execute one tool call from inside server.run."""
+        results = []
+
+        async def fake_run(self, *args, **kwargs):
+            results.append(await self.handlers["call_tool"](name, arguments))
+
+        @asynccontextmanager
+        async def fake_stdio_server():
+            yield MagicMock(), MagicMock()
+
+        with patch.object(mcp_server, "Server", FakeServer), \
+                patch.object(FakeServer, "run", fake_run, create=True), \
+                patch.object(mcp_server, "stdio_server", fake_stdio_server), \
+                patch.object(mcp_server, "VoiceProfileManager", lambda: profiles):
+            await mcp_server.serve(elevenlabs_api_key="test-key")
+
+        return results[0][0].text
+
+    @pytest.mark.asyncio
+    async def test_status_survives_failed_preamble(self, tmp_path):
+        """Test a failing preamble doesn't fail the MIA status readout."""
+        profiles = VoiceProfileManager(config_dir=tmp_path)
+        profiles.create_profile("default", "voice-123", {})
+
+        async def slow_status(self):
+            await asyncio.sleep(0.05)
+            return {"healthy": True, "devices": [1, 2]}
+
+        async def fake_stream_speech(self, text, voice_id, sink, **kwargs):
+            if text.startswith("Checking"):
+                raise OSError("disk full")
+            await sink(b"audio")
+            return True
+
+        with patch.object(mcp_server.MIAVoiceIntegration, "get_mia_status", slow_status), \
+                patch.object(mcp_server.ElevenLabsClient, "stream_speech", fake_stream_speech):
+            text = await self._run_tool(
+                tmp_path, mcp_server.ElevenLabsTools.GET_MIA_STATUS, {}, profiles
+            )
+
+        assert text.startswith("MIA system status: System is healthy. 2 devices connected.")
+        assert "Voice status saved to:" in text
+        assert "preamble" not in text
+
+    @pytest.mark.asyncio
+    async def test_status_keeps_preamble_when_mia_answers_first(self, tmp_path):
+        """Test the fixed status preamble isn't cancelled by a fast MIA response."""
+        profiles = VoiceProfileManager(config_dir=tmp_path)
+        profiles.create_profile("default", "voice-123", {})
+
+        async def fast_status(self):
+            return {"healthy": True, "devices": []}
+
+        async def fake_stream_speech(self, text, voice_id, sink, **kwargs):
+            if text.startswith("Checking"):
+                await asyncio.sleep(0.05)
+            await sink(b"audio")
+            return True
+
+        with patch.object(mcp_server.MIAVoiceIntegration, "get_mia_status", fast_status), \
+                patch.object(mcp_server.ElevenLabsClient, "stream_speech", fake_stream_speech):
+            text = await self._run_tool(
+                tmp_path, mcp_server.ElevenLabsTools.GET_MIA_STATUS, {}, profiles
+            )
+
+        assert "Voice preamble saved to:" in text
+
+    @pytest.mark.asyncio
+    async def test_voice_command_synthesizes_only_the_response(self, tmp_path):
+        """Test a voice command doesn't pay for a per-command preamble."""
+        profiles = VoiceProfileManager(config_dir=tmp_path)
+        profiles.create_profile("default", "voice-123", {})
+        spoken = []
+
+        async def fake_execute(self, command_text):
+            return {"status": "ok"}
+
+        async def fake_stream_speech(self, text, voice_id, sink, **kwargs):
+            spoken.append(text)
+            await sink(b"audio")
+            return True
+
+        with patch.object(mcp_server.MIAVoiceIntegration, "execute_voice_command", fake_execute), \
+                patch.object(mcp_server.ElevenLabsClient, "stream_speech", fake_stream_speech):
+            text = await self._run_tool(
+                tmp_path, mcp_server.ElevenLabsTools.MIA_VOICE_COMMAND,
+                {"command": "turn on the lights"}, profiles
+            )
+
+        assert spoken == ["Voice command executed: turn on the lights. Command completed successfully."]
+        assert "preamble" not in text
+
+    @pytest.mark.asyncio
+    async def test_cached_speech_skips_payload_encoding(self, tmp_path):
+        """Test a speech cache hit neither encodes a payload nor calls ElevenLabs."""
+        profiles = VoiceProfileManager(config_dir=tmp_path)
+        profiles.create_profile("narrator", "voice-123", {})
+        arguments = {"text": "Hello", "profile_name": "narrator"}
+
+        async def fake_stream_speech(self, text, voice_id, sink, **kwargs):
+            await sink(b"audio")
+            return True
+
+        with patch.object(mcp_server.ElevenLabsClient, "stream_speech",
+                          autospec=True, side_effect=fake_stream_speech) as stream, \
+                patch.object(profiles, "speech_payload", wraps=profiles.speech_payload) as payload:
+            tool = mcp_server.ElevenLabsTools.GENERATE_SPEECH_FROM_PROFILE
+            first = await self._run_tool(tmp_path, tool, arguments, profiles)
+            second = await self._run_tool(tmp_path, tool, arguments, profiles)
+
+        assert first == second
+        assert stream.call_count == 1
+        assert payload.call_count == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])